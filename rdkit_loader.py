@@ -0,0 +1,468 @@
+"""
+Loading and inlining of the RDKit assets behind the pathway viewer.
+"""
+
+import binascii
+import functools
+import hashlib
+import mmap
+import os
+import re
+import string
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import streamlit as st
+
+BASE_DIR = Path(__file__).resolve().parent
+HTML_FILE = BASE_DIR / "index.html"
+CACHE_DIR = BASE_DIR / ".cache"
+STATIC_DIR = BASE_DIR / "static"
+STATIC_URL = "./app/static"
+RDKit_JS = "rdkit_minimal.js"
+RDKit_WASM = "RDKit_minimal.wasm"
+RDKit_ASSETS = (
+    (RDKit_JS, "application/javascript"),
+    (RDKit_WASM, "application/wasm"),
+)
+_RDKIT_MIME_TYPES = dict(RDKit_ASSETS)
+_STREAMLIT_VERSION = tuple(int(part) for part in re.findall(r"\d+", st.__version__)[:2])
+# Before 1.56, Streamlit's static route serves anything outside a small
+# image/font allow-list as text/plain with nosniff. fetch() still returns
+# the wasm bytes there, but browsers refuse to run the loader script and
+# reject instantiateStreaming, so the script stays inline and the wasm is
+# fetched as a buffer. From 1.56 both files go out with their real types.
+_STATIC_ROUTE_TYPED = _STREAMLIT_VERSION >= (1, 56)
+_STATIC_ROUTE_ASSETS = frozenset(
+    {RDKit_JS, RDKit_WASM} if _STATIC_ROUTE_TYPED else {RDKit_WASM}
+)
+_HTML_CACHE: Optional[Tuple[Tuple[int, ...], Optional[str]]] = None
+# Memoising fetchWasm; fetch() decodes data: URIs natively, so the inlined
+# wasm needs no atob() loop.
+_FETCH_WASM_NEW = (
+    b"async function fetchWasm(url) {\n"
+    b"      if (window.__rdkitPreloadedWasm) {\n"
+    b"        return window.__rdkitPreloadedWasm;\n"
+    b"      }\n"
+    b"      const response = await fetch(url);\n"
+    b"      if (!response.ok) {\n"
+    b"        throw new Error(`Failed to fetch wasm: ${response.status}`);\n"
+    b"      }\n"
+    b"      const buffer = await response.arrayBuffer();\n"
+    b"      const bytes = new Uint8Array(buffer);\n"
+    b"      window.__rdkitPreloadedWasm = bytes;\n"
+    b"      return bytes;\n"
+    b"    }"
+)
+_ASSET_REFERENCES = (
+    (RDKit_JS, b'src="%s"'),
+    (RDKit_JS, b'const RDKIT_LOCAL_JS = "%s";'),
+    (RDKit_WASM, b'href="%s"'),
+    (RDKit_WASM, b'const RDKIT_LOCAL_WASM = "%s";'),
+)
+# Everything the external page needs rewritten, matched in a single scan:
+# the inline rdkit wasm hook (dropped so we can inject our own loader), the
+# stock fetchWasm helper (whatever line endings the checkout uses) and each
+# literal asset reference.
+_HTML_REWRITE_RE = re.compile(
+    rb"(?P<bootstrap><script>\s*\(function\(\)\s*\{.*?window\.__rdkitLocalWasm"
+    rb"\s*=\s*\"__rdkit_inline_wasm__\";\s*\}\)\(\);\s*</script>\s*)"
+    rb"|(?P<fetch>async function fetchWasm\(url\)\s*\{\s*"
+    rb"const response = await fetch\(url\);.*?"
+    rb"return new Uint8Array\(buffer\);\s*\})|"
+    + b"|".join(
+        re.escape(reference % filename.encode("ascii"))
+        for filename, reference in _ASSET_REFERENCES
+    ),
+    re.DOTALL,
+)
+
+
+def _encode_data_uri(file_path: Path, mime: str) -> bytes:
+    """Base64-encode an asset through a short-lived read-only mapping.
+
+    The mapping is closed before returning so the file is never held open,
+    leaving it free to be replaced or truncated while the app runs.
+    """
+    prefix = f"data:{mime};base64,".encode("ascii")
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return prefix
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return prefix + binascii.b2a_base64(mapped, newline=False)
+
+
+def _static_serving_enabled() -> bool:
+    return bool(st.get_option("server.enableStaticServing"))
+
+
+def _is_inlined(filename: str, static: bool) -> bool:
+    """Whether the page embeds this asset rather than linking the static route."""
+    return not (static and filename in _STATIC_ROUTE_ASSETS)
+
+
+# version_key (see asset_version) only feeds the cache key, so a changed
+# asset is re-encoded instead of serving the previous data URI.
+@functools.lru_cache(maxsize=len(RDKit_ASSETS))
+def _data_uri(filename: str, version_key: Tuple[int, ...]) -> Optional[bytes]:
+    """Base64-encode an asset on first use and keep the result."""
+    file_path = STATIC_DIR / filename
+    if not file_path.exists():
+        return None
+    return _encode_data_uri(file_path, _RDKIT_MIME_TYPES[filename])
+
+
+def _asset_uris(static: bool, version_key: Tuple[int, ...]) -> Dict[str, bytes]:
+    """Resolve each rdkit asset to a static route URL or an inline data URI."""
+    assets: Dict[str, bytes] = {}
+    for filename, _ in RDKit_ASSETS:
+        if not _is_inlined(filename, static):
+            if (STATIC_DIR / filename).exists():
+                assets[filename] = f"{STATIC_URL}/{filename}".encode("ascii")
+            continue
+        data_uri = _data_uri(filename, version_key)
+        if data_uri:
+            assets[filename] = data_uri
+    return assets
+
+
+def _inline_rdkit_assets(content: bytes, assets: Dict[str, bytes]) -> str:
+    """Rewrite the raw page bytes and decode the result exactly once."""
+    table: Dict[bytes, bytes] = {}
+    for filename, reference in _ASSET_REFERENCES:
+        uri = assets.get(filename)
+        if uri:
+            table[reference % filename.encode("ascii")] = reference % uri
+    wasm_uri = assets.get(RDKit_WASM)
+    inline_wasm = bool(wasm_uri and wasm_uri.startswith(b"data:"))
+
+    def _rewrite(match: "re.Match[bytes]") -> bytes:
+        if match.lastgroup == "bootstrap":
+            return b""
+        if match.lastgroup == "fetch":
+            return _FETCH_WASM_NEW if inline_wasm else match.group(0)
+        return table.get(match.group(0), match.group(0))
+
+    return _HTML_REWRITE_RE.sub(_rewrite, content).decode("utf-8")
+
+
+def _has_valid_external_html() -> bool:
+    try:
+        return HTML_FILE.stat().st_size > 0
+    except OSError:
+        return False
+
+
+# With a correctly typed static route the emscripten loader fetches the wasm
+# itself and compiles it with WebAssembly.instantiateStreaming.
+_RDKIT_READY_STREAMING = """const rdkitReady = initRDKitModule({
+      locateFile: () => RDKIT_WASM_URL,
+    });"""
+# Otherwise fetch the wasm once and hand the bytes to initRDKitModule:
+# streaming would be rejected on a text/plain response and emscripten would
+# fetch the file a second time. fetch() also decodes data URIs natively.
+_RDKIT_READY_BUFFERED = """const rdkitReady = fetch(RDKIT_WASM_URL)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Failed to fetch wasm: ${response.status}`);
+        }
+        return response.arrayBuffer();
+      })
+      .then((buffer) => initRDKitModule({ wasmBinary: new Uint8Array(buffer) }));"""
+_INLINE_APP_TEMPLATE = string.Template(
+    """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <title>SMILES Degradation Pathway</title>
+  <style>
+    body {
+      margin: 0;
+      font-family: "Segoe UI", sans-serif;
+      background: #fefefe;
+      color: #222;
+    }
+    .app {
+      display: flex;
+      flex-direction: column;
+      gap: 1rem;
+      padding: 1.5rem;
+    }
+    .controls {
+      display: flex;
+      gap: 0.75rem;
+      flex-wrap: wrap;
+      align-items: flex-start;
+    }
+    textarea {
+      flex: 1;
+      min-height: 120px;
+      padding: 0.75rem;
+      border-radius: 8px;
+      border: 1px solid #d0d0d0;
+      font-size: 0.95rem;
+      resize: vertical;
+    }
+    button {
+      padding: 0.8rem 1.5rem;
+      border-radius: 999px;
+      border: none;
+      background: #2563eb;
+      color: #fff;
+      font-size: 0.95rem;
+      font-weight: 600;
+      cursor: pointer;
+      transition: background 0.2s ease;
+    }
+    button:hover {
+      background: #1d4ed8;
+    }
+    .pathway {
+      display: flex;
+      gap: 1.5rem;
+      flex-wrap: wrap;
+      align-items: center;
+      justify-content: flex-start;
+    }
+    .step {
+      min-width: 220px;
+      padding: 1rem;
+      border-radius: 16px;
+      background: #ffffff;
+      box-shadow: 0 10px 40px rgba(15, 23, 42, 0.1);
+      display: flex;
+      flex-direction: column;
+      gap: 0.5rem;
+    }
+    .step h3 {
+      margin: 0;
+      font-size: 1rem;
+      color: #0f172a;
+    }
+    .step svg {
+      width: 100%;
+      height: auto;
+    }
+    .arrow {
+      font-size: 1.5rem;
+      color: #94a3b8;
+    }
+    .error {
+      color: #b91c1c;
+      font-weight: 600;
+    }
+  </style>
+</head>
+<body>
+  <div class="app">
+    <div class="controls">
+      <textarea id="smiles-input" placeholder="Enter SMILES, one per line">CCO
+CC(=O)O
+O=C(O)C(O)CO</textarea>
+      <button id="render-btn" type="button">Render Pathway</button>
+    </div>
+    <div id="feedback" class="error"></div>
+    <div class="pathway" id="pathway"></div>
+  </div>
+
+  <script src="$js_uri"></script>
+  <script>
+    const RDKIT_WASM_URL = "$wasm_uri";
+
+    $rdkit_ready
+
+    function createStep(index, smiles, svg) {
+      const card = document.createElement("div");
+      card.className = "step";
+      const title = document.createElement("h3");
+      title.innerText = `Step $${index + 1}`;
+      const smilesEl = document.createElement("div");
+      smilesEl.innerText = smiles;
+      smilesEl.style.fontFamily = "monospace";
+      smilesEl.style.fontSize = "0.85rem";
+      const svgWrapper = document.createElement("div");
+      svgWrapper.innerHTML = svg;
+      card.appendChild(title);
+      card.appendChild(svgWrapper);
+      card.appendChild(smilesEl);
+      return card;
+    }
+
+    async function renderPathway() {
+      const feedback = document.getElementById("feedback");
+      const container = document.getElementById("pathway");
+      feedback.innerText = "";
+      container.innerHTML = "<p>Rendering pathway…</p>";
+      const rawInput = document.getElementById("smiles-input").value || "";
+      const smilesList = rawInput
+        .split(/\\n+/)
+        .map((item) => item.trim())
+        .filter(Boolean);
+
+      if (!smilesList.length) {
+        container.innerHTML = "";
+        feedback.innerText = "Please provide at least one SMILES string.";
+        return;
+      }
+
+      try {
+        const RDKit = await rdkitReady;
+        container.innerHTML = "";
+        smilesList.forEach((smiles, index) => {
+          try {
+            const mol = RDKit.get_mol(smiles);
+            const svg = mol.get_svg();
+            mol.delete();
+            const stepEl = createStep(index, smiles, svg);
+            container.appendChild(stepEl);
+            if (index < smilesList.length - 1) {
+              const arrow = document.createElement("div");
+              arrow.className = "arrow";
+              arrow.innerHTML = "&#8594;";
+              container.appendChild(arrow);
+            }
+          } catch (err) {
+            const errorCard = document.createElement("div");
+            errorCard.className = "step";
+            errorCard.innerHTML = `<strong>Error parsing:</strong> $${smiles}`;
+            container.appendChild(errorCard);
+          }
+        });
+      } catch (error) {
+        container.innerHTML = "";
+        feedback.innerText =
+          "Failed to initialize RDKit. Please refresh and try again.";
+      }
+    }
+
+    document
+      .getElementById("render-btn")
+      .addEventListener("click", renderPathway);
+
+    window.addEventListener("DOMContentLoaded", () => {
+      renderPathway();
+    });
+  </script>
+</body>
+</html>
+    """
+)
+
+
+def _build_inline_app(assets: Dict[str, bytes]) -> Optional[str]:
+    js_uri = assets.get(RDKit_JS)
+    wasm_uri = assets.get(RDKit_WASM)
+    if not js_uri or not wasm_uri:
+        return None
+    streaming = _STATIC_ROUTE_TYPED and not wasm_uri.startswith(b"data:")
+    return _INLINE_APP_TEMPLATE.substitute(
+        js_uri=js_uri.decode("ascii"),
+        wasm_uri=wasm_uri.decode("ascii"),
+        rdkit_ready=_RDKIT_READY_STREAMING if streaming else _RDKIT_READY_BUFFERED,
+    )
+
+
+def asset_version() -> Tuple[int, ...]:
+    """Return the mtime and size of every file the page is rendered from."""
+    # The loader itself is part of the key so changes to the rewriting
+    # logic never serve HTML rendered by an older version.
+    sources = (
+        Path(__file__),
+        HTML_FILE,
+        STATIC_DIR / RDKit_JS,
+        STATIC_DIR / RDKit_WASM,
+    )
+    version = []
+    for file_path in sources:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            version.extend((-1, -1))
+            continue
+        version.extend((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def _html_cache_path(version_key: Tuple[int, ...], static: bool) -> Path:
+    """Return the on-disk cache location for this version of the sources."""
+    # The static layout also depends on the installed Streamlit, which can
+    # change between restarts without touching any of the hashed files.
+    if static:
+        digest = hashlib.sha1(b"static-typed;" if _STATIC_ROUTE_TYPED else b"static;")
+    else:
+        digest = hashlib.sha1(b"inline;")
+    digest.update(repr(version_key).encode("ascii"))
+    return CACHE_DIR / f"index.{digest.hexdigest()[:16]}.html"
+
+
+def _write_html_cache(cache_path: Path, content: str) -> None:
+    """Persist the rendered HTML atomically; a read-only disk is not fatal.
+
+    The page is written as raw UTF-8 so line endings survive byte-for-byte.
+    """
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(content.encode("utf-8"))
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError:
+        return
+
+    # Only the current version is ever served; drop pages left by old keys
+    # and temp files orphaned by writes that were killed part-way.
+    stale_paths = [*CACHE_DIR.glob("index.*.html"), *CACHE_DIR.glob("*.tmp")]
+    for stale_path in stale_paths:
+        if stale_path != cache_path:
+            try:
+                stale_path.unlink()
+            except OSError:
+                pass
+
+
+def _render_html(static: bool, version_key: Tuple[int, ...]) -> Optional[str]:
+    if _has_valid_external_html():
+        content = HTML_FILE.read_bytes()
+        return _inline_rdkit_assets(content, _asset_uris(static, version_key))
+
+    # Fallback only: the bundled page is used when index.html is absent.
+    return _build_inline_app(_asset_uris(static, version_key))
+
+
+# cache_resource hands every session the same object instead of unpickling
+# a private copy of the multi-MB page; callers must treat it as read-only.
+# version_key only feeds the cache key, so one entry per deploy is kept.
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_html_cached(version_key: Tuple[int, ...]) -> Optional[str]:
+    """Return the app HTML, reusing the on-disk copy across process restarts."""
+    static = _static_serving_enabled()
+    cache_path = _html_cache_path(version_key, static)
+    try:
+        return cache_path.read_bytes().decode("utf-8")
+    except OSError:
+        # Not written yet, or pruned by another process since.
+        pass
+
+    content = _render_html(static, version_key)
+    if content:
+        _write_html_cache(cache_path, content)
+    return content
+
+
+def load_html(version_key: Tuple[int, ...]) -> Optional[str]:
+    """Return the app HTML without a Streamlit cache lookup after the first hit.
+
+    ``version_key`` should come from :func:`asset_version` so a changed
+    index.html or RDKit asset evicts the cached page.
+    """
+    global _HTML_CACHE
+    if _HTML_CACHE is None or _HTML_CACHE[0] != version_key:
+        _HTML_CACHE = (version_key, _load_html_cached(version_key))
+    return _HTML_CACHE[1]